@@ -0,0 +1,28 @@
+from collections import OrderedDict
+
+class Cache():
+    '''Caché LRU de tamaño fijo para superficies ya escaladas o renderizadas.
+
+    "misses" cuenta cuántas superficies nuevas se han tenido que crear, así
+    se puede medir la tasa de asignación del ciclo principal.
+    '''
+
+    def __init__(self, size):
+        self.size = size
+        self.items = OrderedDict()
+        self.misses = 0
+
+    def get(self, key):
+        item = self.items.get(key)
+        if item is not None:
+            self.items.move_to_end(key)
+        return item
+
+    def put(self, key, item):
+        self.misses += 1
+        self.items[key] = item
+        if len(self.items) > self.size:
+            self.items.popitem(last=False)
+
+    def __len__(self):
+        return len(self.items)
@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+import pygame
+
+LEVELS = 16     # niveles por octava del factor Doppler
+MAX_LEVEL = 12  # hasta 3/4 de octava hacia el rojo o hacia el azul
+
+# longitud de onda (nm) que representa cada canal R, G, B
+CHANNELS = (610.0, 550.0, 465.0)
+# fuera del rango de los canales el espectro emitido se apaga en FADE nm
+FADE = 250.0
+
+def factor(velocity, dx, distance):
+    '''factor Doppler relativista D = f_observada/f_emitida.
+
+    velocity es la velocidad de la fuente en unidades de c (con signo), dx la
+    distancia horizontal de la fuente al observador (observador - fuente) y
+    distance la distancia perpendicular entre la línea de movimiento y el
+    observador.'''
+    r = math.hypot(dx, distance)
+    return math.sqrt(1 - velocity*velocity)/(1 - velocity*dx/r)
+
+class ColorShift():
+    '''Recolorea superficies según el factor Doppler cuantizado.
+
+    Para cada nivel se arma una tabla (canal destino, canal origen, valor)
+    con el aporte de cada canal emitido a cada canal observado; las imágenes
+    recoloreadas se guardan en las cachés de quien las pide, así que en cada
+    cuadro solo se hace un blit.'''
+
+    def __init__(self):
+        self.luts = {}
+
+    def level(self, doppler):
+        level = int(round(math.log2(doppler)*LEVELS))
+        return max(-MAX_LEVEL, min(MAX_LEVEL, level))
+
+    def weights(self, level):
+        '''matriz 3x3 [observado, emitido]: cada canal observado toma el
+        espectro emitido en su longitud de onda por D, interpolado entre
+        los tres canales'''
+        doppler = 2**(level/LEVELS)
+        red, green, blue = CHANNELS
+        matrix = np.zeros((3, 3))
+        for dst, wavelength in enumerate(CHANNELS):
+            emitted = wavelength*doppler
+            if emitted >= red:
+                matrix[dst, 0] = max(0.0, 1 - (emitted - red)/FADE)
+            elif emitted >= green:
+                w = (emitted - green)/(red - green)
+                matrix[dst, 0] = w
+                matrix[dst, 1] = 1 - w
+            elif emitted >= blue:
+                w = (emitted - blue)/(green - blue)
+                matrix[dst, 1] = w
+                matrix[dst, 2] = 1 - w
+            else:
+                matrix[dst, 2] = max(0.0, 1 - (blue - emitted)/FADE)
+        return matrix
+
+    def lut(self, level):
+        lut = self.luts.get(level)
+        if lut is None:
+            values = np.arange(256)
+            lut = np.rint(self.weights(level)[:, :, None]*values).astype(np.uint16)
+            self.luts[level] = lut
+        return lut
+
+    def apply(self, surface, level):
+        '''copia de surface con los colores corridos; conserva la transparencia'''
+        lut = self.lut(level)
+        rgb = pygame.surfarray.array3d(surface)
+        out = lut[:, 0, rgb[..., 0]] + lut[:, 1, rgb[..., 1]] + lut[:, 2, rgb[..., 2]]
+        shifted = surface.copy()
+        pixels = pygame.surfarray.pixels3d(shifted)
+        pixels[...] = np.minimum(np.moveaxis(out, 0, -1), 255)
+        del pixels
+        return shifted
@@ -0,0 +1,197 @@
+'''Exportación del estado de la simulación en memoria compartida.
+
+run_game publica cada cuadro en un búfer circular de SLOTS ranuras con
+disposición fija (ver HEADER y SLOT), así otros procesos lo leen sin
+sockets ni serialización, mapeando la memoria con numpy:
+
+    python Export.py            # muestra el estado de una sesión en curso
+
+Cada ranura lleva el número de cuadro "seq". El productor pone seq = 0
+mientras escribe y al final escribe seq en la ranura y en el encabezado;
+el lector toma seq del encabezado, copia la ranura seq % SLOTS y la acepta
+solo si su seq no cambió durante la copia.
+
+El encabezado guarda el pid del productor: una segunda sesión con el mismo
+nombre falla mientras la primera siga viva, en lugar de quitarle la
+memoria. StateReader es para otro proceso, no para el que publica.
+'''
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+NAME = 'lorentz_sim'
+MAGIC = b'LORENTZ1'
+VERSION = 1
+SLOTS = 8
+MAX_PILLARS = 64
+
+HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('slots', '<u4'),
+                   ('max_pillars', '<u4'), ('pid', '<u4'), ('seq', '<u8'),
+                   ('global_l', '<f8'), ('global_c', '<f8')])
+
+# posiciones en pixeles, tiempos en segundos; los pilares son los de la fila
+# inferior (marco del cohete) y su x es relativa al cohete
+SLOT = np.dtype([('seq', '<u8'), ('global_time', '<f8'), ('alpha', '<f8'),
+                 ('beta', '<f8'), ('rocket_x', '<f8'), ('n_pillars', '<u4'),
+                 ('pad', '<u4'), ('index', '<i8', (MAX_PILLARS,)),
+                 ('x', '<f8', (MAX_PILLARS,)), ('clock', '<f8', (MAX_PILLARS,))])
+
+SIZE = HEADER.itemsize + SLOTS*SLOT.itemsize
+
+def _views(buf):
+    header = np.ndarray((), HEADER, buffer=buf)
+    slots = np.ndarray((SLOTS,), SLOT, buffer=buf, offset=HEADER.itemsize)
+    return(header, slots)
+
+def _untrack(shm, pid):
+    '''quita la memoria abierta (no creada) del registro que la borra al
+    salir del proceso; la borra solo quien la creó. Si pid es este mismo
+    proceso, el registro es el del productor y se queda.'''
+    if os.name != 'nt' and pid != os.getpid():
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister('/' + shm.name, 'shared_memory')
+
+def _alive(pid):
+    '''¿sigue corriendo el proceso pid?'''
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        # en Windows la memoria se libera con el último proceso que la
+        # tiene abierta; si todavía existe, alguien la usa
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class StateExport():
+    '''lado productor, lo usa run_game'''
+
+    def __init__(self, global_l, global_c, name = NAME):
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=SIZE)
+        except FileExistsError:
+            old = shared_memory.SharedMemory(name)
+            header = _views(old.buf)[0]
+            ours = bytes(header['magic']) == MAGIC
+            pid = int(header['pid'])
+            del header
+            if not ours or _alive(pid):
+                _untrack(old, pid if ours else None)
+                old.close()
+                raise FileExistsError('la memoria compartida %s ya está en uso (pid %d); '
+                                      'use otro nombre con --export' % (name, pid))
+            # quedó de una sesión que no cerró bien
+            old.close()
+            old.unlink()
+            self.shm = shared_memory.SharedMemory(name, create=True, size=SIZE)
+        self.header, self.slots = _views(self.shm.buf)
+        self.slots[:] = np.zeros(SLOTS, SLOT)
+        self.header['magic'] = MAGIC
+        self.header['version'] = VERSION
+        self.header['slots'] = SLOTS
+        self.header['max_pillars'] = MAX_PILLARS
+        self.header['pid'] = os.getpid()
+        self.header['global_l'] = global_l
+        self.header['global_c'] = global_c
+        self.header['seq'] = 0
+        self.seq = 0
+        # vistas por campo, escribir en ellas es más barato que en la ranura
+        self.f_seq = self.slots['seq']
+        self.f_global_time = self.slots['global_time']
+        self.f_alpha = self.slots['alpha']
+        self.f_beta = self.slots['beta']
+        self.f_rocket_x = self.slots['rocket_x']
+        self.f_n_pillars = self.slots['n_pillars']
+        self.f_index = self.slots['index']
+        self.f_x = self.slots['x']
+        self.f_clock = self.slots['clock']
+        self.f_header_seq = self.header['seq'].reshape(1)
+
+    def publish(self, global_time, alpha, beta, rocket_x, index, x, clock):
+        self.seq += 1
+        k = self.seq % SLOTS
+        n = min(len(index), MAX_PILLARS)
+        self.f_seq[k] = 0
+        self.f_global_time[k] = global_time
+        self.f_alpha[k] = alpha
+        self.f_beta[k] = beta
+        self.f_rocket_x[k] = rocket_x
+        self.f_n_pillars[k] = n
+        self.f_index[k, :n] = index[:n]
+        self.f_x[k, :n] = x[:n]
+        self.f_clock[k, :n] = clock[:n]
+        self.f_seq[k] = self.seq
+        self.f_header_seq[0] = self.seq
+
+    def close(self):
+        # las vistas de numpy tienen que soltarse antes de cerrar
+        del self.header, self.slots, self.f_seq, self.f_global_time, self.f_alpha
+        del self.f_beta, self.f_rocket_x, self.f_n_pillars, self.f_index, self.f_x
+        del self.f_clock, self.f_header_seq
+        self.shm.close()
+        self.shm.unlink()
+
+class StateReader():
+    '''lado lector, para herramientas externas; se usa desde otro proceso'''
+
+    def __init__(self, name = NAME):
+        self.shm = shared_memory.SharedMemory(name)
+        self.header, self.slots = _views(self.shm.buf)
+        # solo se conecta, quien borra la memoria es el productor
+        _untrack(self.shm, int(self.header['pid']))
+        if bytes(self.header['magic']) != MAGIC or int(self.header['version']) != VERSION:
+            self.close()
+            raise ValueError('%s no es una exportación de la simulación' % name)
+        self.global_l = float(self.header['global_l'])
+        self.global_c = float(self.header['global_c'])
+
+    def read(self, seq):
+        '''copia del cuadro seq, None si ya se sobrescribió o aún no existe'''
+        if seq == 0:
+            return None
+        slot = self.slots[seq % SLOTS]
+        if int(slot['seq']) != seq:
+            return None
+        state = slot.copy()
+        if int(slot['seq']) != seq:
+            return None
+        n = int(state['n_pillars'])
+        return {'seq': seq,
+                'global_time': float(state['global_time']),
+                'alpha': float(state['alpha']),
+                'beta': float(state['beta']),
+                'rocket_x': float(state['rocket_x']),
+                'index': state['index'][:n],
+                'x': state['x'][:n],
+                'clock': state['clock'][:n]}
+
+    def latest(self):
+        while True:
+            seq = int(self.header['seq'])
+            state = self.read(seq)
+            if state is not None or seq == 0:
+                return state
+
+    def close(self):
+        del self.header, self.slots
+        self.shm.close()
+
+if __name__ == '__main__':
+    import time
+
+    reader = StateReader()
+    try:
+        while True:
+            state = reader.latest()
+            if state is not None:
+                print('%8d  t = %8.3f s  alpha = %.3f  x = %9.1f px  pilares %s'
+                      % (state['seq'], state['global_time'], state['alpha'],
+                         state['rocket_x'], state['index'].tolist()))
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        reader.close()
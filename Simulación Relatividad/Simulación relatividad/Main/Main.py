@@ -1,6 +1,11 @@
 ﻿import pygame
 import math
 import time
+import argparse
+import threading
+from collections import namedtuple
+
+import numpy as np
 
 from Rocket import Rocket
 from Watch  import Watch
@@ -11,7 +16,45 @@ from Button import Scroll
 from Button import Change_velocity
 from Button import Galileo
 from Button import Arrow
-def run_game():
+from Scenario import Scenario
+from Cache import Cache
+from Text import Text
+from Export import StateExport
+from Doppler import ColorShift
+from Doppler import factor as doppler_factor
+from Doppler import MAX_LEVEL
+from Observer import delay
+from Observer import current_x
+from Observer import retarded
+from Snapshots import DoubleBuffer
+
+KIOSK_IDLE_MS = 90000 # inactividad antes de volver al estado inicial (modo kiosco)
+IDLE_MS = 1000 # con la escena quieta se redibuja una vez por segundo
+FIRE_MS = 1000/15 # cada cuadro de la animación del fuego
+
+# todo lo que el hilo de dibujo necesita de un cuadro de la simulación
+Snapshot = namedtuple('Snapshot', ['global_time', 'alpha', 'beta', 'fire', 'fire_count',
+                                   'rocket_1_x', 'rocket_1_level', 'frame1_ind',
+                                   'frame1_rocket_time2', 'frame2_rocket_time',
+                                   'frame2_index', 'frame2_x', 'frame2_time',
+                                   'galileo', 'galileo_button', 'compare', 'doppler', 'observed',
+                                   'slider_x', 'mouse_pos', 'mouse_click'])
+
+def run_game(scenario_file = None, kiosk = False, max_frames = None, frame_ms = None, on_frame = None,
+             export_name = None, doppler = False, observed = False, compare = False, threaded = True):
+    '''kiosk: vuelve solo al estado inicial tras KIOSK_IDLE_MS sin entrada.
+    export_name: nombre de la memoria compartida donde se publica el estado
+    de cada cuadro (ver Export.py).
+    doppler: teñir cohete y pilares en movimiento según el corrimiento
+    Doppler relativista (se cambia con la tecla D).
+    observed: la fila inferior muestra lo que ve el cohete, con el retraso
+    de la luz (se cambia con la tecla O).
+    compare: Galileo y Lorentz lado a lado (se cambia con la tecla C).
+    threaded: dibujar en otro hilo; la entrada y la simulación no esperan
+    al dibujo, solo le pasan un Snapshot por cuadro (ver Snapshots.py).
+    max_frames, frame_ms y on_frame sirven para correr el ciclo sin ventana
+    (ver Soak.py): número de cuadros, duración fija simulada de cada cuadro
+    en ms y función llamada tras cada cuadro.'''
     '''inicia pygame'''
     pygame.init()
     
@@ -50,6 +93,18 @@ def run_game():
     GLOBAL_C = 400 # velocidad de la luz
     frame_count = 0 
     
+    # escenario con movimiento acelerado (opcional)
+    scenario = None
+    if scenario_file is not None:
+        scenario = Scenario(scenario_file, GLOBAL_C)
+    rocket_x = None
+    rocket_tau = 0.0
+    
+    # estado de cada cuadro en memoria compartida (opcional)
+    export = None
+    if export_name is not None:
+        export = StateExport(GLOBAL_L, GLOBAL_C, export_name)
+    
     if WIDTH == 1600: 
         border = 70    
         
@@ -63,10 +118,20 @@ def run_game():
     LEFT_KLICK = False
     RIGHT_KLICK = False
     MENU = False           
+    KIOSK_RESET = False
+    DOPPLER = doppler
+    OBSERVED = observed
+    COMPARE = compare
+    STATIC = False
+    SLEPT = False
+    FIRE = True
+    idle_ms = 0
+    fire_ms = 0.0
     INSTRUCTION = False
     
     mouse_x = 0 
     mouse_y = 0 
+    mouse_pos = (0, 0)
     
     frame_rate = 0.0    
 
@@ -123,31 +188,33 @@ def run_game():
     
     '''fuentes'''
     font_1 = pygame.font.SysFont("arial", 18, bold=True)
-    font_2 = pygame.font.Font('font\courbd.ttf', 19)
-    font_3 = pygame.font.Font('font\mpus.ttf', 22)
-    font_4 = pygame.font.Font('font\courierstd-bold.otf', 22)
-    font_5 = pygame.font.Font('font\mpus.ttf', 56)
+    font_2 = pygame.font.Font('font/courbd.ttf', 19)
+    font_3 = pygame.font.Font('font/mpus.ttf', 22)
+    font_4 = pygame.font.Font('font/courierstd-bold.otf', 22)
+    font_5 = pygame.font.Font('font/mpus.ttf', 56)
+    
+    # glifos en caché, no se crea una superficie por texto en cada cuadro
+    glyphs_1 = Text(font_1)
+    glyphs_2 = Text(font_2)
+    glyphs_3 = Text(font_3)
+    glyphs_4 = Text(font_4)
+    glyphs_5 = Text(font_5)
 
     
     def text_1(Ttext, Tcolor, Tlocation):
-        text = font_1.render(Ttext, True, Tcolor)
-        screen.blit(text, Tlocation)
+        glyphs_1.blit(screen, Ttext, Tcolor, Tlocation)
     
     def text_2(Ttext, Tcolor, Tlocation):
-        text = font_2.render(Ttext, True, Tcolor)
-        screen.blit(text, Tlocation)
+        glyphs_2.blit(screen, Ttext, Tcolor, Tlocation)
 
     def text_3(Ttext, Tcolor, Tlocation):
-        text = font_3.render(Ttext, True, Tcolor)
-        screen.blit(text, Tlocation)
+        glyphs_3.blit(screen, Ttext, Tcolor, Tlocation)
         
     def text_4(Ttext, Tcolor, Tlocation):
-        text = font_4.render(Ttext, True, Tcolor)
-        screen.blit(text, Tlocation)
+        glyphs_4.blit(screen, Ttext, Tcolor, Tlocation)
         
     def text_5(Ttext, Tcolor, Tlocation):
-        text = font_5.render(Ttext, True, Tcolor)
-        screen.blit(text, Tlocation)
+        glyphs_5.blit(screen, Ttext, Tcolor, Tlocation)
     
     
     if WIDTH == 1600:
@@ -169,6 +236,8 @@ def run_game():
         bt_right = Scroll(screen ,WIDTH-130 , 490 , 'imagenes/bt_scroll_right_light.png','imagenes/bt_scroll_right.png',  (100, 60))
         bt_galileo = Galileo(screen ,WIDTH-190, 790 , 'imagenes/Galileo_off.png','imagenes/Galileo_on.png',  (360, 50))
         bt_arrow = Arrow(screen ,WIDTH - 100, HEIGHT - 50, 'imagenes/flecha.png','imagenes/flecha2.png',  (50, 25))
+    
+    slider_x = bt_1.rect.left  # posición del control de velocidad
         
     img_pillar = pygame.image.load('imagenes/pilar.png')
     img_pillar = pygame.transform.scale(img_pillar, (100, 192))
@@ -181,10 +250,26 @@ def run_game():
     x = 0 
     y = 0
     
-    def img_load(beta, img_pillar, img_pillar_2):
+    pillar_cache = Cache(64)
+    pillar_tint_cache = Cache(2*MAX_LEVEL + 1)  # pilar sin escalar, por nivel Doppler
+    color_shift = ColorShift()
+    
+    def img_load(beta, img_pillar, img_pillar_2, level = 0, size = 1):
+        # size: 0.5 para las vistas reducidas de la comparación
         scale = 1/beta
-        img_pillar = img_pillar_2
-        img_pillar = pygame.transform.scale(img_pillar, (int(102/scale), 192))
+        width = int(102*size/scale)
+        height = int(192*size)
+        img_pillar = pillar_cache.get((width, height, level))
+        if img_pillar is None:
+            img_source = img_pillar_2
+            if level != 0:
+                # se tiñe una vez por nivel; con alpha cambiando solo se escala
+                img_source = pillar_tint_cache.get(level)
+                if img_source is None:
+                    img_source = color_shift.apply(img_pillar_2, level)
+                    pillar_tint_cache.put(level, img_source)
+            img_pillar = pygame.transform.scale(img_source, (width, height))
+            pillar_cache.put((width, height, level), img_pillar)
         rect = img_pillar.get_rect()
         rect.bottom = 870
         return(img_pillar, rect)
@@ -199,10 +284,89 @@ def run_game():
        y = 25*math.sin(math.pi/2-math.pi/30*t)
        return(x,y)
        
-    def blitme_pillar(screen, color, img, rect, x, y):
+    frame2_x_obs = border + 1.5*GLOBAL_L  # el cohete de la fila inferior
+    frame2_window = 2.5*GLOBAL_L  # distancia al cohete hasta donde se dibujan pilares
+    
+    # ventanas del marco (background) por donde se ve la escena
+    if WIDTH == 1600:
+        scene_x, scene_w = 61, 1045
+    if WIDTH == 1440:
+        scene_x, scene_w = 55, 941
+    if WIDTH == 1200:
+        scene_x, scene_w = 30, 770
+    # modo de comparación: cada fila de cada vista completa se dibuja a la
+    # mitad de tamaño, Galileo en la mitad izquierda de la ventana y Lorentz
+    # en la derecha (recortadas a la pantalla, por si la ventana salió más chica)
+    compare_scene = pygame.Rect(scene_x, 40, scene_w, 830).clip(screen_rect)
+    compare_rows = [pygame.Rect(scene_x, 40, scene_w, 400).clip(screen_rect),
+                    pygame.Rect(scene_x, 470, scene_w, 400).clip(screen_rect)]
+    # el fondo de cada fila ya reducido, no cambia
+    compare_back = [pygame.transform.smoothscale(background2.subsurface(row), (row.w//2, row.h//2))
+                    for row in compare_rows]
+    
+    def compare_place(row, view):
+        '''rect de la fila reducida en pantalla y (ox, oy, size) para pasar de
+        coordenadas de la escena completa a ella: (ox + size*x, oy + size*y)'''
+        half = pygame.Rect(row.x + view*(row.w//2), row.y + row.h//4, row.w//2, row.h//2)
+        return(half, (half.x - row.x/2, half.y - row.y/2, 0.5))
+    
+    def frame2_pillars(global_time, alpha, beta, rocket_x, rows):
+        '''índice, x en pantalla y lectura del reloj de los pilares de la fila
+        inferior para las transformaciones en rows: 0 Galileo, 1 Lorentz.
+        Con las dos (modo de comparación) salen de una sola pasada; x y t
+        tienen None en la que no se pidió. En la vista del observador se usa
+        la posición y la lectura de cuando salió la luz que ve el cohete.'''
+        rows = list(rows)
+        scale = np.array([1, beta])[rows]
+        time_step = np.array([0, alpha*GLOBAL_L/GLOBAL_C])[rows]
+        if rocket_x is None:
+            shift = np.array([alpha*GLOBAL_C*global_time, alpha*GLOBAL_C*global_time])[rows]
+            time0 = np.array([global_time, beta*global_time])[rows]
+        else:
+            # Lorentz en el marco comóvil instantáneo del cohete
+            shift = np.array([rocket_x, beta*rocket_x])[rows]
+            time0 = np.array([global_time, global_time - alpha*rocket_x/GLOBAL_C])[rows]
+        lo = frame2_x_obs - 2*GLOBAL_L
+        hi = frame2_x_obs + 2*GLOBAL_L
+        if OBSERVED:
+            # pilares que ahora están donde se verán en los bordes
+            lo = current_x(lo, frame2_x_obs, -alpha*GLOBAL_C, GLOBAL_L, GLOBAL_C)
+            hi = current_x(hi, frame2_x_obs, -alpha*GLOBAL_C, GLOBAL_L, GLOBAL_C)
+        # un pilar de margen: con aceleración lo y hi son aproximados
+        a = int(np.ceil((lo - frame2_x_obs + shift)/scale/GLOBAL_L).min()) - 1
+        b = int(np.floor((hi - frame2_x_obs + shift)/scale/GLOBAL_L + 1).max()) + 1
+        ind = np.arange(a, b+1)
+        x = scale[:, None]*(ind-1)*GLOBAL_L - shift[:, None] + frame2_x_obs
+        t = time0[:, None] + time_step[:, None]*(ind-1)
+        if OBSERVED:
+            # con velocidad constante; para Lorentz es exacto aun acelerando
+            # (ver Observer.py)
+            light = delay(x, frame2_x_obs, -alpha*GLOBAL_C, GLOBAL_L, GLOBAL_C)
+            x = x + alpha*GLOBAL_C*light
+            t = t - scale[:, None]*light
+            if rocket_x is not None and 0 in rows:
+                # Galileo con escenario: la velocidad cambia durante el
+                # tiempo de luz, se resuelve con la trayectoria tabulada
+                k = rows.index(0)
+                X = (ind-1)*GLOBAL_L
+                light = retarded(X, global_time, scenario.x_at, scenario.velocity_at, GLOBAL_L, GLOBAL_C, light[k])
+                x[k] = X - scenario.x_at(global_time - light) + frame2_x_obs
+                t[k] = global_time - light
+        # van en el Snapshot, que es de solo lectura
+        ind.flags.writeable = False
+        x.flags.writeable = False
+        t.flags.writeable = False
+        frame2_x = [None, None]
+        frame2_time = [None, None]
+        for k, row in enumerate(rows):
+            frame2_x[row] = x[k]
+            frame2_time[row] = t[k]
+        return(ind, tuple(frame2_x), tuple(frame2_time))
+    
+    def blitme_pillar(screen, color, img, rect, x, y, size = 1):
         screen.blit(img, rect)
-        pygame.draw.line(screen, color, (rect.centerx,rect.bottom -143), 
-                 (rect.centerx + x, rect.bottom -143 - y), 2)
+        pygame.draw.line(screen, color, (rect.centerx,rect.bottom -143*size), 
+                 (rect.centerx + x*size, rect.bottom -143*size - y*size), max(1, int(2*size)))
   
     
     
@@ -227,10 +391,16 @@ def run_game():
     img_watchpick2 = img_watchpick
     rect_icon = img_watchpick.get_rect()
 
-    def img_load_icons(beta, img_watchpick, img_watchpick2):
+    icon_cache = Cache(32)
+    
+    def img_load_icons(beta, img_watchpick, img_watchpick2, size = 1):
         scale = 1/beta
-        img_watchpick = img_watchpick2
-        img_watchpick = pygame.transform.scale(img_watchpick, (int(20/scale), 20))
+        width = int(20*size/scale)
+        height = int(20*size)
+        img_watchpick = icon_cache.get((width, height))
+        if img_watchpick is None:
+            img_watchpick = pygame.transform.scale(img_watchpick2, (width, height))
+            icon_cache.put((width, height), img_watchpick)
         rect = img_watchpick.get_rect()
         rect.centery = 150
         return(img_watchpick, rect)
@@ -246,6 +416,85 @@ def run_game():
     img_c = pygame.image.load('imagenes/C.png')
     img_c = pygame.transform.scale(img_c, (39, 40))
     img_c = img_c.convert_alpha()
+    # la A de las vistas reducidas
+    img_a_half = pygame.transform.smoothscale(img_a, (20, 20))
+    
+    def draw_rocket_1(snap, lorentz, place = (0, 0, 1)):
+        # place: (ox, oy, size), ver compare_place
+        ox, oy, size = place
+        if lorentz:
+            rocket_1.Lx_scale(snap.alpha, oy + 150*size, GLOBAL_L*size, color_shift, snap.rocket_1_level, 
+                              ox + snap.rocket_1_x*size)
+            beta = snap.beta
+        else:
+            rocket_1.Lx_scale(0, oy + 150*size, GLOBAL_L*size, center_x = ox + snap.rocket_1_x*size)
+            beta = 1
+        rocket_1.img_load()
+        rocket_1.blitme(snap.fire_count)
+        draw_marks(rocket_1, beta, lorentz, size)
+        
+    def draw_rocket_2(snap, place = (0, 0, 1)):
+        ox, oy, size = place
+        rocket_2.Lx_scale(0, oy + 580*size, GLOBAL_L*size, center_x = ox + frame2_x_obs*size)
+        rocket_2.img_load()
+        rocket_2.blitme(snap.fire_count)
+        draw_marks(rocket_2, 1, True, size)
+        
+    def draw_marks(rocket, beta, line, size):
+        # línea verde, reloj y letra A sobre el cohete
+        if line:
+            pygame.draw.line(screen, (37, 153, 42), (rocket.rect.centerx, rocket.rect.centery - 60*size), 
+                            (rocket.rect.centerx, rocket.rect.centery))
+        img_watchpick, rect_icon = img_load_icons(beta, img_watchpick2, img_watchpick2, size)
+        rect_icon.center = rocket.rect.center
+        screen.blit(img_watchpick, rect_icon)
+        screen.blit(img_a if size == 1 else img_a_half, (rocket.rect.centerx - 20*size, rocket.rect.centery - 100*size))
+        
+    def draw_upper_pillars(snap, place = (0, 0, 1)):
+        ox, oy, size = place
+        x, y = update_watchup(snap.global_time)
+        img_pillar = img_pillar_2 if size == 1 else img_load(1, img_pillar_2, img_pillar_2, size = size)[0]
+        rect_pillar = pygame.Rect(0, 0, 102*size, 192*size)
+        for k in range(3):
+            rect_pillar.x = ox + (border-51 + (k + 0.5)*GLOBAL_L)*size
+            rect_pillar.y = oy + 248*size
+            blitme_pillar(screen, BLACK, img_pillar, rect_pillar, x, y, size)
+        
+    def draw_pillars(snap, lorentz, labels = True, place = (0, 0, 1)):
+        '''regresa (índice, x, tiempo) de los pilares dibujados'''
+        ox, oy, size = place
+        if lorentz:
+            pillar_x, pillar_time, beta = snap.frame2_x[1], snap.frame2_time[1], snap.beta
+        else:
+            pillar_x, pillar_time, beta = snap.frame2_x[0], snap.frame2_time[0], 1
+        visible = np.abs(pillar_x - frame2_x_obs) < frame2_window
+        img_pillar, rect_pillar = img_load(beta, img_pillar_2, img_pillar_2, size = size)
+        pillars = list(zip(snap.frame2_index[visible].tolist(), pillar_x[visible].tolist(), 
+                           pillar_time[visible].tolist()))
+        for ind, frame2_pillar_x, frame2_pillar_time in pillars:
+            if snap.doppler and lorentz:
+                # los pilares se mueven a -alpha vistos desde el cohete
+                level = color_shift.level(doppler_factor(-snap.alpha, frame2_x_obs - frame2_pillar_x, GLOBAL_L))
+                img_pillar, rect_pillar = img_load(beta, img_pillar_2, img_pillar_2, level, size)
+            rect_pillar.centerx = ox + frame2_pillar_x*size
+            rect_pillar.bottom = oy + 870*size
+            x, y = update_watchdown(frame2_pillar_time, beta)
+            blitme_pillar(screen, BLACK, img_pillar, rect_pillar, x, y, size)
+            if labels:
+                text_1(str(ind%1000), WHITE,(rect_pillar.centerx - 6, 636))
+                str_time = time_to_string(frame2_pillar_time)
+                text_1('[' + str_time + ']', WHITE,(rect_pillar.centerx - 33, 655))
+        return pillars
+        
+    def compare_label(row, view, x, number, str_time):
+        # en la vista reducida los textos irían a la mitad de tamaño; se
+        # escriben a tamaño normal en la franja debajo de la fila
+        x = row.x + view*(row.w//2) + (x - row.x)/2
+        if x - 33 < row.x + view*(row.w//2) or x + 33 > row.x + (view + 1)*(row.w//2):
+            return
+        y = row.y + row.h*3//4 + 8
+        text_1(number, WHITE, (x - 6, y))
+        text_1('[' + str_time + ']', WHITE, (x - 33, y + 19))
     
     
     
@@ -253,23 +502,243 @@ def run_game():
     timer = pygame.time.Clock()
     timer.tick()
     
+    # todas las superficies creadas dentro del ciclo pasan por estas cachés
+    caches = [pillar_cache, pillar_tint_cache, icon_cache, rocket_1.cache, rocket_1.tint_cache, rocket_1.fire_cache,
+              rocket_2.cache, rocket_2.fire_cache, glyphs_1.glyphs, glyphs_2.glyphs,
+              glyphs_3.glyphs, glyphs_4.glyphs, glyphs_5.glyphs]
+    
     def time_to_string(x):
         if x < 0:
             x += 60*60
         return str(math.floor(x/60)*10+1001)[1:3]+':'+str(math.floor(x%60)*10+1001)[1:3]+':'+str((x-math.floor(x))*1000+1001)[1:3]   
     
+    def draw(snap):
+        '''dibuja un cuadro a partir de un Snapshot; solo lee de snap, las
+        superficies, cachés y relojes son del hilo de dibujo'''
+        rocket_1.firestop = snap.fire
+        rocket_2.firestop = snap.fire
+        screen.blit(background2, screen_rect)
+
+        frame1_pillar1_ind = (snap.frame1_ind)*4 
+        frame1_pillar2_ind = (snap.frame1_ind)*4 + 1
+        frame1_pillar3_ind = (snap.frame1_ind)*4 + 2
+        str_time = time_to_string(snap.global_time)
+        
+        if snap.compare:
+            # cada vista se dibuja ya reducida, con las imágenes de las cachés
+            # al tamaño de la mitad
+            screen.fill(BLACK, compare_scene)
+            upper, lower = compare_rows
+            for view in range(2):
+                for row, back in zip(compare_rows, compare_back):
+                    screen.blit(back, compare_place(row, view)[0])
+                half, place = compare_place(upper, view)
+                screen.set_clip(half)
+                draw_upper_pillars(snap, place)
+                draw_rocket_1(snap, view == 1, place)
+                half, place = compare_place(lower, view)
+                screen.set_clip(half)
+                draw_rocket_2(snap, place)
+                pillars = draw_pillars(snap, view == 1, labels = False, place = place)
+                screen.set_clip(None)
+                for k, ind in enumerate((frame1_pillar1_ind, frame1_pillar2_ind, frame1_pillar3_ind)):
+                    compare_label(upper, view, border + (k + 0.5)*GLOBAL_L, str(ind%100), str_time)
+                for ind, frame2_pillar_x, frame2_pillar_time in pillars:
+                    compare_label(lower, view, frame2_pillar_x, str(ind%1000), time_to_string(frame2_pillar_time))
+            pygame.draw.line(screen, WHITE, (scene_x + scene_w//2, compare_scene.top), 
+                             (scene_x + scene_w//2, compare_scene.bottom))
+            text_1('Galileo', WHITE, (scene_x + 20, 60))
+            text_1('Lorentz', WHITE, (scene_x + scene_w//2 + 20, 60))
+        else:
+            draw_rocket_2(snap)
+            draw_upper_pillars(snap)
+            text_1(str(frame1_pillar1_ind%100), WHITE,(border-6 + GLOBAL_L/2, 206))
+            text_1(str(frame1_pillar2_ind%100), WHITE,(border-6 + 1.5*GLOBAL_L, 206))
+            text_1(str(frame1_pillar3_ind%100), WHITE,(border-6 + 2.5*GLOBAL_L, 206))
+            
+            text_1('['+ str_time + ']', WHITE,(border-33 + GLOBAL_L/2, 225))
+            text_1('['+ str_time + ']', WHITE,(border-33 + 1.5*GLOBAL_L, 225))
+            text_1('['+ str_time + ']', WHITE,(border-33 + 2.5*GLOBAL_L, 225))
+            
+            draw_rocket_1(snap, not snap.galileo)
+            draw_pillars(snap, not snap.galileo)
+                
+            
+        if snap.observed:
+            text_1('Vista del observador (tiempo de luz)', WHITE, (border + 10, 480))
+         
+        if WIDTH != 1200:
+            screen.blit(background, screen_rect)
+        else:
+            screen.blit(back_left, (0,0))
+            screen.blit(back_centr, (30, 0))
+            screen.blit(back_right, (800,0))
+        bt_1.bt1_x = snap.slider_x
+        bt_1.blitme()
+        if bt_start.rect.collidepoint(snap.mouse_pos) and snap.mouse_click:
+            bt_start.blitme()
+        else:
+            bt_start.blitmeclick()
+            
+        if bt_pause.rect.collidepoint(snap.mouse_pos) and snap.mouse_click:
+            bt_pause.blitmeclick()
+        else:
+            bt_pause.blitme()
+        
+        if bt_stop.rect.collidepoint(snap.mouse_pos) and snap.mouse_click:
+            bt_stop.blitme()
+        else:
+            bt_stop.blitmeclick()
+            
+        if bt_left.rect.collidepoint(snap.mouse_pos) and snap.mouse_click:
+            bt_left.blitme()
+        else:
+            bt_left.blitmeclick()
+            
+        if bt_right.rect.collidepoint(snap.mouse_pos) and snap.mouse_click:
+            bt_right.blitme()
+        else:
+            bt_right.blitmeclick()
+            
+        if not snap.galileo_button:
+            bt_galileo.blitme()
+        else:
+            bt_galileo.blitmeclick()
+        
+ 
+        if snap.compare:
+            # manecilla roja: Galileo, negra: Lorentz
+            watch2.update(snap.global_time)
+            watch2.blitme(RED)
+            watch2.update(snap.frame1_rocket_time2)
+            watch2.blithand(BLACK)
+            watch5.update(snap.global_time)
+            watch5.blitme(RED)
+            watch5.update(snap.frame2_rocket_time)
+            watch5.blithand(BLACK)
+            str_time = time_to_string(snap.global_time)
+            text_2(str_time, RED, (watch2.rect.centerx - 43, watch2.rect.centery + 78))
+            text_2(str_time, RED, (watch5.rect.centerx - 43, watch5.rect.centery + 78))
+        else:
+            if not snap.galileo:
+                watch2.update(snap.frame1_rocket_time2)
+                watch5.update(snap.frame2_rocket_time)
+            else:
+                watch2.update(snap.global_time)
+                watch5.update(snap.global_time)
+            watch2.blitme(BLACK)
+            watch5.blitme(BLACK)
+
+
+        #watches text
+        if snap.compare or not snap.galileo:
+                
+            screen.blit(img_a, (watch2.rect.centerx - 20, watch2.rect.centery - 130))
+            str_time = time_to_string(snap.frame1_rocket_time2)
+            if WIDTH==1600:
+                text_2(str_time, BLACK, (watch2.rect.centerx - 43, watch2.rect.centery +  53))
+            if WIDTH==1440 or WIDTH==1200:   
+                text_2(str_time, BLACK, (watch2.rect.centerx - 43, watch2.rect.centery +  48))
+                
+
+            str_time = time_to_string(snap.frame2_rocket_time)
+
+                
+            screen.blit(img_a, (watch5.rect.centerx - 20, watch5.rect.centery - 130))
+            if WIDTH==1600:
+                text_2(str_time, BLACK, (watch5.rect.centerx - 43, watch5.rect.centery +  53))
+            if WIDTH==1440 or WIDTH==1200:
+                text_2(str_time, BLACK, (watch5.rect.centerx - 43, watch5.rect.centery +  48))                   
+                
+        else:
+
+            str_time = time_to_string(snap.global_time)
+            
+            screen.blit(img_a, (watch2.rect.centerx - 20, watch2.rect.centery - 130))
+            if WIDTH==1600:
+                text_2(str_time, BLACK, (watch2.rect.centerx - 43, watch2.rect.centery +  53))
+            if WIDTH==1440 or WIDTH==1200:
+                text_2(str_time, BLACK, (watch2.rect.centerx - 43, watch2.rect.centery +  48))
+                
+            screen.blit(img_a, (watch5.rect.centerx - 20, watch5.rect.centery - 130))
+            if WIDTH==1600:
+                text_2(str_time, BLACK, (watch5.rect.centerx - 43, watch5.rect.centery +  53))
+            if WIDTH==1440 or WIDTH==1200:    
+                text_2(str_time, BLACK, (watch5.rect.centerx - 43, watch5.rect.centery +  48))
+                
+                
+        text_4("Comenzar", BLACK, (bt_start.rect.centerx-50, bt_start.rect.centery-7))
+        text_4("Pausa", BLACK, (bt_pause.rect.centerx-30, bt_pause.rect.centery-7))
+        text_4("Detener", BLACK, (bt_stop.rect.centerx-40, bt_stop.rect.centery-7))
+        text_2("Transformación", BLACK, (bt_galileo.rect.centerx-168, bt_galileo.rect.centery-18))
+        text_2("Galileana", BLACK, (bt_galileo.rect.centerx-168, bt_galileo.rect.centery +3))
+        text_2("Transformación", BLACK, (bt_galileo.rect.centerx + 15, bt_galileo.rect.centery-18))
+        text_2("Lorentz", BLACK, (bt_galileo.rect.centerx + 15, bt_galileo.rect.centery +3))               
+    
+        if WIDTH == 1600:
+            text_4("Velocidad:",          BLACK, (1370, 270))
+            text_4(str(round(snap.alpha, 3))+" c", BLACK, (1370, 310))
+            text_4("",     BLACK, (1370, 350))
+                
+        if WIDTH==1440 or WIDTH==1200:
+            text_4("Velocidad:",          BLACK, (WIDTH-140, 270))
+            text_4(str(round(snap.alpha, 3))+" c" , BLACK, (WIDTH-140, 310))
+            text_4("",           BLACK, (WIDTH-140, 350))
+    
+    def render_loop():
+        try:
+            while True:
+                snap = snapshots.take()
+                if snap is None:
+                    break
+                draw(snap)
+                pygame.display.flip()
+        except Exception as error:
+            # se vuelve a lanzar en el hilo principal
+            render_error.append(error)
+            snapshots.close()
+    
     screen.blit(s, (0,0))
     screen.blit(uacj, (screen_rect.centerx-300, screen_rect.centery-100))
     screen.blit(iit, (screen_rect.centerx, screen_rect.centery-100))
     pygame.display.flip()
-    time.sleep(1.5)
+    if frame_ms is None:
+        time.sleep(1.5)
+    
+    snapshots = DoubleBuffer()
+    render_error = []
+    render_thread = None
+    if threaded:
+        render_thread = threading.Thread(target=render_loop, name='render', daemon=True)
+        render_thread.start()
+        
     while not DONE:
         
+        woken = []
+        if STATIC and frame_ms is None:
+            # escena quieta: se duerme hasta que haya entrada o toque redibujar
+            event = pygame.event.wait(IDLE_MS)
+            while event.type == pygame.MOUSEMOTION:
+                # mover el mouse no cambia la escena
+                idle_ms = 0
+                event = pygame.event.wait(IDLE_MS)
+            if event.type != pygame.NOEVENT:
+                # va antes que el resto de la cola (un KEYUP ya encolado no
+                # puede procesarse antes que su KEYDOWN)
+                woken = [event]
+            # el tiempo dormido queda en este tick y no en el del próximo cuadro
+            clock.tick()
+            SLEPT = True
+        
         mouse_pos = pygame.mouse.get_pos()
         mouse_x = mouse_pos[0]
         mouse_y = mouse_pos[1]
         
-        for event in pygame.event.get():  
+        for event in woken + pygame.event.get():  
+            if event.type in (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN,
+                              pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION):
+                idle_ms = 0
+                
             if event.type == pygame.QUIT:  
                 DONE = True  
                 
@@ -282,15 +751,22 @@ def run_game():
                     rocket_1.global_rocket_t_start = 0
                     bt_pause.pause = True
                     alpha = 0
-                    bt_1.bt1_x = bt_1.rect.left
-                    rocket_1.img_load()
-                    rocket_1.firestop = False
-                    rocket_2.firestop = False
+                    slider_x = bt_1.rect.left
+                    FIRE = False
                     
                     
                 if event.key == pygame.K_RIGHT:
                     RIGHT_KLICK = True
                     
+                if event.key == pygame.K_d:
+                    DOPPLER = not DOPPLER
+                    
+                if event.key == pygame.K_o:
+                    OBSERVED = not OBSERVED
+                    
+                if event.key == pygame.K_c:
+                    COMPARE = not COMPARE
+                    
                 if event.key == pygame.K_LEFT:
                     LEFT_KLICK = True
       
@@ -325,7 +801,25 @@ def run_game():
                 GALILEO = False
             
             frame_count += 1 
-            frame_rate = clock.get_time()
+            if frame_ms is None:
+                frame_rate = clock.get_time()
+            else:
+                frame_rate = frame_ms
+            
+            # el fuego se anima a su propio ritmo, no con cada cuadro
+            fire_ms += frame_rate
+            fire_count = int(fire_ms//FIRE_MS)
+            
+            # modo kiosco: sin entrada por un rato se vuelve al estado inicial
+            idle_ms += frame_rate
+            if kiosk and idle_ms >= KIOSK_IDLE_MS:
+                KIOSK_RESET = True
+                idle_ms = 0
+                
+            if SLEPT:
+                # al despertar, el tiempo dormido no avanza la simulación
+                frame_rate = 0
+                SLEPT = False
             
             # factor transformación de lorentz
             beta = math.sqrt(1 - alpha*alpha)
@@ -333,77 +827,75 @@ def run_game():
             if bt_pause.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True:
                 bt_pause.pause = True
             else:
-                rocket_1.firestop = True
-                rocket_2.firestop = True
+                FIRE = True
                 
             if bt_pause.pause:
                 frame_rate = 0
-                rocket_1.firestop = False
-                rocket_2.firestop = False
+                FIRE = False
                 
             if bt_left.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True and bt_pause.pause:
                 if global_time > 0:
-                    rocket_1.firestop = True
-                    rocket_2.firestop = True
-                    global_time -= 0.01/(alpha+0.01)
+                    FIRE = True
+                    global_time -= 0.01/(abs(alpha)+0.01)
                 else:
                     global_time = 0
                     
             if LEFT_KLICK and bt_pause.pause:
                 if global_time > 0:
-                    rocket_1.firestop = True
-                    rocket_2.firestop = True
-                    global_time -= 0.0025/(alpha+0.01)
+                    FIRE = True
+                    global_time -= 0.0025/(abs(alpha)+0.01)
                 else:
                     global_time = 0
                     
             if bt_right.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True and bt_pause.pause:
-                rocket_1.firestop = True
-                rocket_2.firestop = True
-                global_time += 0.01/(alpha+0.01)
+                FIRE = True
+                global_time += 0.01/(abs(alpha)+0.01)
                 
             if RIGHT_KLICK and bt_pause.pause:
-                rocket_1.firestop = True
-                rocket_2.firestop = True
-                global_time += 0.0025/(alpha+0.01)
+                FIRE = True
+                global_time += 0.0025/(abs(alpha)+0.01)
 
             
             if bt_start.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True:
                 bt_pause.pause = False
-                if alpha == 0:
+                if alpha == 0 and scenario is None:
                     alpha = 0.05
-                rocket_1.firestop = True
-                rocket_2.firestop = True
+                FIRE = True
                 
-            if bt_1.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True and global_time == 0:
-                    bt_1.bt1_x = mouse_x-10
+            if bt_1.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True and global_time == 0 and scenario is None:
+                    slider_x = mouse_x-10
                     frame_rate = 0
                     if  (mouse_x - bt_1.rect.left)/200 > 0.98:
                         alpha = 0.98 
                     else:
                         alpha = ((mouse_x - bt_1.rect.left)/200)
-                        rocket_1.img_load()
                         rocket_1.global_rocket_t_start = global_time
                         rocket_1.global_rocket_x_start = rocket_1.global_rocket_x
                     if WIDTH < 1600 and (mouse_x - bt_1.rect.left)/200 > 0.965:
                         alpha = 0.965
                 
-            if bt_stop.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True:
+            if (bt_stop.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True) or KIOSK_RESET:
                 rocket_1.global_rocket_x_start = 0
                 rocket_1.global_rocket_t_start = 0
                 global_time = 0
                 bt_pause.pause = True
                 alpha = 0
-                bt_1.bt1_x = bt_1.rect.left
-                rocket_1.img_load()
-                rocket_1.firestop = False
-                rocket_2.firestop = False
+                slider_x = bt_1.rect.left
+                FIRE = False
+                
+            if KIOSK_RESET:
+                KIOSK_RESET = False
+                bt_galileo.flag = False
+                LEFT_KLICK = False
+                RIGHT_KLICK = False
+                # los modos de las teclas D, O y C vuelven a los de inicio
+                DOPPLER = doppler
+                OBSERVED = observed
+                COMPARE = compare
                 
             if bt_galileo.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True and bt_galileo.clickflag == True:
                 bt_galileo.click()
-                rocket_1.img_load()
             else:
-                rocket_1.img_load()
                 bt_galileo.clickflag == True
                 
             if MOUSE_KLICK == False:
@@ -415,222 +907,101 @@ def run_game():
             if frame_rate != 0:
                 # global time
                 global_time += frame_rate /1000
+            
+            if scenario is not None:
+                # trayectoria precalculada, solo se interpola
+                rocket_x, alpha, rocket_tau = scenario.at(global_time)
+                beta = math.sqrt(1 - alpha*alpha)
                 
             frame1_rocket_time1 = global_time*beta + alpha*GLOBAL_L*0.5/GLOBAL_C
             frame1_rocket_time2 = global_time*beta
             frame1_rocket_time3 = global_time*beta - alpha*GLOBAL_L*0.5/GLOBAL_C
+            frame2_rocket_time = global_time
+            if scenario is not None:
+                frame1_rocket_time2 = rocket_tau
+                frame2_rocket_time = rocket_tau
             
                
-            if not GALILEO:
-                rocket_1.Lx_scale(alpha, 150, GLOBAL_L)
-            else:
-                rocket_1.Lx_scale(0, 150, GLOBAL_L)
+            rocket_1.update(alpha, GLOBAL_C, GLOBAL_L, frame1_rocket_length, global_time, frame1_ind, border, rocket_x)
+            
+            rocket_1_level = 0
+            if DOPPLER:
+                # el observador está frente al pilar central de la fila superior
+                rocket_1_level = color_shift.level(doppler_factor(alpha, border + 1.5*GLOBAL_L - rocket_1.center_x, GLOBAL_L))
             
-               
-            rocket_1.update(alpha, GLOBAL_C, GLOBAL_L, frame1_rocket_length, global_time, frame1_ind, border)
             frame1_ind = math.floor((rocket_1.global_rocket_x + 2*GLOBAL_L)/(4*GLOBAL_L))
             
                 
             frame1_rocket_length = beta*GLOBAL_L
             
-            
-            if not GALILEO:
-
-                watch2.update(frame1_rocket_time2)
-
-                watch5.update(global_time)
-
+            if COMPARE:
+                rows = (0, 1)
+            elif not GALILEO:
+                rows = (1,)
             else:
-
-                watch2.update(global_time)
-
-                watch5.update(global_time)
-        
+                rows = (0,)
+            frame2_index, frame2_x, frame2_time = frame2_pillars(global_time, alpha, beta, rocket_x, rows)
         
-        if not MENU:
-            screen.blit(background2, screen_rect)
-
-            rocket_1.blitme(frame_count)
-            rocket_2.blitme(frame_count)
-            if not GALILEO:
-            
-                pygame.draw.line(screen, (37, 153, 42), (rocket_1.rect.centerx, rocket_1.rect.centery - 60), 
-                                (rocket_1.rect.centerx, rocket_1.rect.centery))
-
         
-            pygame.draw.line(screen, (37, 153, 42), (rocket_2.rect.centerx, rocket_2.rect.centery - 60), 
-                            (rocket_2.rect.centerx, rocket_2.rect.centery))
-
-            
-            screen.blit(img_watchpick2, (rocket_2.rect.centerx - 10, rocket_2.rect.centery - 10))
-            if not GALILEO:
-                img_watchpick, rect_icon = img_load_icons(beta, img_watchpick, img_watchpick2)
-                rect_icon.centerx = rocket_1.rect.centerx
-                screen.blit(img_watchpick, rect_icon)
-                
-                
-                screen.blit(img_a, (rocket_1.rect.centerx - 20, rocket_1.rect.centery - 100))
-            else:
-                img_watchpick, rect_icon = img_load_icons(1, img_watchpick, img_watchpick2)
-                rect_icon.centerx = rocket_1.rect.centerx
-                screen.blit(img_watchpick, rect_icon)
-                
-                screen.blit(img_a, (rocket_1.rect.centerx - 20, rocket_1.rect.centery - 100))
-
-            
-            screen.blit(img_a, (rocket_2.rect.centerx - 20, rocket_2.rect.centery - 100))
-
-                        #pillar update and draw
-            frame1_pillar1_ind = (frame1_ind)*4 
-            frame1_pillar2_ind = (frame1_ind)*4 + 1
-            frame1_pillar3_ind = (frame1_ind)*4 + 2
-                
-            x, y = update_watchup(global_time)
-            blitme_pillar(screen, BLACK, img_pillar_2, pygame.Rect(border-51 + GLOBAL_L/2, 248, 102, 192), x, y)
-            blitme_pillar(screen, BLACK, img_pillar_2, pygame.Rect(border-51 + 1.5*GLOBAL_L, 248, 102, 192), x, y)
-            blitme_pillar(screen, BLACK, img_pillar_2, pygame.Rect(border-51 + 2.5*GLOBAL_L, 248, 102, 192), x, y)
-            
-            text_1(str(frame1_pillar1_ind%100), WHITE,(border-6 + GLOBAL_L/2, 206))
-            text_1(str(frame1_pillar2_ind%100), WHITE,(border-6 + 1.5*GLOBAL_L, 206))
-            text_1(str(frame1_pillar3_ind%100), WHITE,(border-6 + 2.5*GLOBAL_L, 206))
-            
-            str_time = time_to_string(global_time)
-            text_1('['+ str_time + ']', WHITE,(border-33 + GLOBAL_L/2, 225))
-            text_1('['+ str_time + ']', WHITE,(border-33 + 1.5*GLOBAL_L, 225))
-            text_1('['+ str_time + ']', WHITE,(border-33 + 2.5*GLOBAL_L, 225))
-                
-            if not GALILEO:
-                a = math.ceil((-2*GLOBAL_L+alpha*GLOBAL_C*global_time)/beta/GLOBAL_L) 
-                b = math.floor((2*GLOBAL_L+alpha*GLOBAL_C*global_time)/beta/GLOBAL_L+1)
-                img_pillar, rect_pillar = img_load(beta, img_pillar, img_pillar_2)
-                
-                for ind in range(a, b+1):
-                    frame2_pillar_x = beta*(ind-1)*GLOBAL_L-GLOBAL_C*alpha*global_time + 1.5*GLOBAL_L + border
-                    frame2_pillar_time = beta*global_time + alpha*GLOBAL_L/GLOBAL_C*(ind - 1)
-                    rect_pillar.centerx = frame2_pillar_x
-                    x, y = update_watchdown(frame2_pillar_time, beta)
-                    blitme_pillar(screen, BLACK, img_pillar, rect_pillar, x, y)
-                    text_1(str(ind%1000), WHITE,(rect_pillar.centerx - 6, 636))
-                    str_time = time_to_string(frame2_pillar_time)
-                    text_1('[' + str_time + ']', WHITE,(rect_pillar.centerx - 33, 655))
-            else:
-                a = math.ceil((-2*GLOBAL_L+alpha*GLOBAL_C*global_time)/GLOBAL_L) 
-                b = math.floor((2*GLOBAL_L+alpha*GLOBAL_C*global_time)/GLOBAL_L+1)
-                img_pillar, rect_pillar = img_load(1, img_pillar, img_pillar_2)
-                
-                for ind in range(a, b+1):
-                    frame2_pillar_x = (ind-1)*GLOBAL_L-GLOBAL_C*alpha*global_time + 1.5*GLOBAL_L + border
-                    frame2_pillar_time = global_time
-                    rect_pillar.centerx = frame2_pillar_x
-                    x, y = update_watchdown(frame2_pillar_time, beta)
-                    blitme_pillar(screen, BLACK, img_pillar, rect_pillar, x, y)
-                    text_1(str(ind%1000), WHITE,(rect_pillar.centerx - 6, 636))
-                    str_time = time_to_string(frame2_pillar_time)
-                    text_1('[' + str_time + ']', WHITE,(rect_pillar.centerx - 33, 655))
-                
-          
-             
-            if WIDTH != 1200:
-                screen.blit(background, screen_rect)
-            else:
-                screen.blit(back_left, (0,0))
-                screen.blit(back_centr, (30, 0))
-                screen.blit(back_right, (800,0))
-            bt_1.blitme()
-            if bt_start.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True:
-                bt_start.blitme()
+        if export is not None:
+            if COMPARE or not GALILEO:
+                row = 1
             else:
-                bt_start.blitmeclick()
-                
-            if bt_pause.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True:
-                bt_pause.blitmeclick()
-            else:
-                bt_pause.blitme()
-            
-            if bt_stop.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True:
-                bt_stop.blitme()
-            else:
-                bt_stop.blitmeclick()
-                
-            if bt_left.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True:
-                bt_left.blitme()
-            else:
-                bt_left.blitmeclick()
-                
-            if bt_right.rect.collidepoint(mouse_pos) and MOUSE_KLICK == True:
-                bt_right.blitme()
-            else:
-                bt_right.blitmeclick()
-                
-            if not bt_galileo.flag:
-                bt_galileo.blitme()
-            else:
-                bt_galileo.blitmeclick()
-            
- 
-            watch2.blitme(BLACK)
-            watch5.blitme(BLACK)
-
-
-            #watches text
-            if not GALILEO:
-                    
-                screen.blit(img_a, (watch2.rect.centerx - 20, watch2.rect.centery - 130))
-                str_time = time_to_string(frame1_rocket_time2)
-                if WIDTH==1600:
-                    text_2(str_time, BLACK, (watch2.rect.centerx - 43, watch2.rect.centery +  53))
-                if WIDTH==1440 or WIDTH==1200:   
-                    text_2(str_time, BLACK, (watch2.rect.centerx - 43, watch2.rect.centery +  48))
-                    
-
-                str_time = time_to_string(global_time)
-
-                    
-                screen.blit(img_a, (watch5.rect.centerx - 20, watch5.rect.centery - 130))
-                if WIDTH==1600:
-                    text_2(str_time, BLACK, (watch5.rect.centerx - 43, watch5.rect.centery +  53))
-                if WIDTH==1440 or WIDTH==1200:
-                    text_2(str_time, BLACK, (watch5.rect.centerx - 43, watch5.rect.centery +  48))                   
-                    
-            else:
-
-                str_time = time_to_string(global_time)
-                
-                screen.blit(img_a, (watch2.rect.centerx - 20, watch2.rect.centery - 130))
-                if WIDTH==1600:
-                    text_2(str_time, BLACK, (watch2.rect.centerx - 43, watch2.rect.centery +  53))
-                if WIDTH==1440 or WIDTH==1200:
-                    text_2(str_time, BLACK, (watch2.rect.centerx - 43, watch2.rect.centery +  48))
-                    
-                screen.blit(img_a, (watch5.rect.centerx - 20, watch5.rect.centery - 130))
-                if WIDTH==1600:
-                    text_2(str_time, BLACK, (watch5.rect.centerx - 43, watch5.rect.centery +  53))
-                if WIDTH==1440 or WIDTH==1200:    
-                    text_2(str_time, BLACK, (watch5.rect.centerx - 43, watch5.rect.centery +  48))
-                    
-                    
-            text_4("Comenzar", BLACK, (bt_start.rect.centerx-50, bt_start.rect.centery-7))
-            text_4("Pausa", BLACK, (bt_pause.rect.centerx-30, bt_pause.rect.centery-7))
-            text_4("Detener", BLACK, (bt_stop.rect.centerx-40, bt_stop.rect.centery-7))
-            text_2("Transformación", BLACK, (bt_galileo.rect.centerx-168, bt_galileo.rect.centery-18))
-            text_2("Galileana", BLACK, (bt_galileo.rect.centerx-168, bt_galileo.rect.centery +3))
-            text_2("Transformación", BLACK, (bt_galileo.rect.centerx + 15, bt_galileo.rect.centery-18))
-            text_2("Lorentz", BLACK, (bt_galileo.rect.centerx + 15, bt_galileo.rect.centery +3))               
+                row = 0
+            visible = np.abs(frame2_x[row] - frame2_x_obs) < frame2_window
+            export.publish(global_time, alpha, beta, rocket_1.global_rocket_x, frame2_index[visible],
+                           frame2_x[row][visible] - frame2_x_obs, frame2_time[row][visible])
         
-            if WIDTH == 1600:
-                text_4("Velocidad:",          BLACK, (1370, 270))
-                text_4(str(round(alpha, 3))+" c", BLACK, (1370, 310))
-                text_4("",     BLACK, (1370, 350))
-                    
-            if WIDTH==1440 or WIDTH==1200:
-                text_4("Velocidad:",          BLACK, (WIDTH-140, 270))
-                text_4(str(round(alpha, 3))+" c" , BLACK, (WIDTH-140, 310))
-                text_4("",           BLACK, (WIDTH-140, 350))           
-                
-        clock.tick(60)
-    
-        pygame.display.flip()
+        snapshot = Snapshot(global_time, alpha, beta, FIRE, fire_count, rocket_1.center_x, rocket_1_level,
+                            frame1_ind, frame1_rocket_time2, frame2_rocket_time,
+                            frame2_index, frame2_x, frame2_time, GALILEO, bt_galileo.flag,
+                            COMPARE, DOPPLER, OBSERVED, slider_x, mouse_pos, MOUSE_KLICK)
+        if render_thread is None:
+            draw(snapshot)
+            pygame.display.flip()
+        else:
+            # con tiempo simulado cada cuadro se dibuja; en tiempo real el
+            # dibujo toma el más reciente y la entrada nunca lo espera
+            snapshots.publish(snapshot, wait = frame_ms is not None)
+            if render_error:
+                raise render_error[0]
+        
+        if frame_ms is None:
+            clock.tick(60)
+        else:
+            clock.tick()
+        
+        # nada se mueve hasta la próxima entrada: pausa sin botones presionados
+        # (en modo simulado, con frame_ms, nunca se duerme)
+        STATIC = bt_pause.pause and not MOUSE_KLICK and not LEFT_KLICK and not RIGHT_KLICK
+        
+        if on_frame is not None:
+            on_frame(frame_count, sum(len(c) for c in caches), sum(c.misses for c in caches))
+        if max_frames is not None and frame_count >= max_frames:
+            DONE = True
+    
+    if render_thread is not None:
+        # termina de dibujar el último cuadro publicado
+        snapshots.close()
+        render_thread.join()
+        if render_error:
+            raise render_error[0]
+    
+    if export is not None:
+        export.close()
 
-run_game()
-pygame.quit()
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Simulación de las transformaciones de Lorentz')
+    parser.add_argument('--scenario', help='archivo JSON con un perfil de velocidad/aceleración (ver escenarios/)')
+    parser.add_argument('--kiosk', action='store_true', help='volver al estado inicial tras un rato sin entrada')
+    parser.add_argument('--export', nargs='?', const='lorentz_sim', metavar='NOMBRE',
+                        help='publicar el estado de cada cuadro en memoria compartida (ver Export.py)')
+    parser.add_argument('--doppler', action='store_true', help='teñir según el corrimiento Doppler (tecla D)')
+    parser.add_argument('--observed', action='store_true', help='fila inferior como la ve el cohete, con el tiempo de luz (tecla O)')
+    parser.add_argument('--compare', action='store_true', help='Galileo y Lorentz lado a lado (tecla C)')
+    parser.add_argument('--single-thread', action='store_true', help='dibujar en el mismo hilo que la simulación')
+    args = parser.parse_args()
+    run_game(args.scenario, kiosk=args.kiosk, export_name=args.export, doppler=args.doppler,
+             observed=args.observed, compare=args.compare, threaded=not args.single_thread)
+    pygame.quit()
     
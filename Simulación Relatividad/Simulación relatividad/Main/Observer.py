@@ -0,0 +1,46 @@
+'''Lo que ve el observador: posiciones retardadas por el tiempo de luz.
+
+Un pilar que ahora está en x y se mueve con velocidad v (px/s) se ve donde
+estaba cuando salió la luz que llega ahora al observador, que está en
+x_obs a una distancia perpendicular distance de la fila de pilares. Con
+Δ = t - t_emisión y X = x_obs - x:
+
+    c²Δ² = (X + vΔ)² + distance²
+
+es una cuadrática en Δ con una sola raíz positiva, así que se resuelve en
+forma cerrada para todo el arreglo de pilares a la vez.
+
+delay, apparent_x y current_x suponen que v no cambió durante el tiempo
+de luz. Con Lorentz eso se cumple aunque el cohete acelere: los pilares
+son inerciales, y en el marco comóvil del cohete en el momento de la
+recepción se han movido siempre a -v. Con Galileo (luz a c respecto al
+cohete) no: con un escenario acelerado v cambia mucho durante Δ, que es
+de cerca de un segundo, y retarded resuelve con la trayectoria tabulada.
+'''
+import numpy as np
+
+def delay(x, x_obs, velocity, distance, global_c):
+    '''tiempo de viaje de la luz (s) para pilares que ahora están en x (arreglo)'''
+    X = x_obs - x
+    a = global_c*global_c - velocity*velocity
+    return (X*velocity + np.sqrt(X*X*velocity*velocity + a*(X*X + distance*distance)))/a
+
+def apparent_x(x, x_obs, velocity, distance, global_c):
+    '''posición donde se ven los pilares que ahora están en x'''
+    return x - velocity*delay(x, x_obs, velocity, distance, global_c)
+
+def current_x(x_seen, x_obs, velocity, distance, global_c):
+    '''inversa de apparent_x: dónde está ahora un pilar que se ve en x_seen'''
+    return x_seen + velocity*np.hypot(x_obs - x_seen, distance)/global_c
+
+def retarded(X, t, position, velocity, distance, global_c, light):
+    '''tiempo de luz (Galileo, luz a c respecto al cohete) desde pilares en
+    X hasta el cohete, cuya posición y velocidad en el tiempo dan las
+    funciones position y velocity. Resuelve c*Δ = |X - position(t - Δ)|
+    con pasos de Newton a partir de light (p. ej. delay con la velocidad
+    actual, que ya está muy cerca).'''
+    for i in range(3):
+        p = X - position(t - light)
+        r = np.hypot(p, distance)
+        light = light - (global_c*light - r)/(global_c - p*velocity(t - light)/r)
+    return light
@@ -1,12 +1,17 @@
 import pygame
 import math
 
+from Cache import Cache
+from Doppler import MAX_LEVEL
+
 class Rocket():
     
     def __init__(self, screen, center_x, center_y, global_l):
         self.screen = screen
       
         self.scale = 1
+        self.global_l = global_l
+        self.size = 1  # tamaño del dibujo (0.5 en las vistas de comparación)
         
         self.img_rocket = pygame.image.load('imagenes/rocket.png')
         self.img_rocket = pygame.transform.scale(self.img_rocket, (int(global_l/self.scale), int(global_l*0.411)))
@@ -27,44 +32,80 @@ class Rocket():
         self.rect = self.img_rocket.get_rect()
         self.rect.centerx = center_x
         self.rect.centery = center_y
+        self.center_x = center_x
         self.k = 1
         self.global_rocket_x = 0
         self.global_rocket_x_start = 0
         self.global_rocket_t_start = 0
         self.firestop = True
+        # imágenes contraídas ya escaladas, por tamaño (y nivel Doppler)
+        self.cache = Cache(64)
+        # imagen sin escalar ya teñida, una por nivel Doppler
+        self.tint_cache = Cache(2*MAX_LEVEL + 1)
+        self.fire_cache = Cache(64)
 
     def blitme(self,frame_count):
        
         self.screen.blit(self.img_rocket, (self.rect))
         
         if self.firestop == True:
+            x = self.rect.left - self.rect_fire.right + int(3*self.size)
+            y = self.rect.centery - int(25*self.size)
             if frame_count%3 == 0:
-                self.screen.blit(self.fire1, (self.rect.left - self.rect_fire.right + 3, self.rect.centery - 25))
-                self.screen.blit(self.fire2, (self.rect.left - self.rect_fire.right + 3, self.rect.centery - 25))
+                self.screen.blit(self.fire1, (x, y))
+                self.screen.blit(self.fire2, (x, y))
             elif frame_count%3 == 1:
-                self.screen.blit(self.fire2, (self.rect.left - self.rect_fire.right + 3, self.rect.centery - 25))
-                self.screen.blit(self.fire3, (self.rect.left - self.rect_fire.right + 3, self.rect.centery - 25))
+                self.screen.blit(self.fire2, (x, y))
+                self.screen.blit(self.fire3, (x, y))
             elif frame_count%3 == 2:
-                self.screen.blit(self.fire3, (self.rect.left - self.rect_fire.right + 3, self.rect.centery - 25))
-                self.screen.blit(self.fire1, (self.rect.left - self.rect_fire.right + 3, self.rect.centery - 25))
+                self.screen.blit(self.fire3, (x, y))
+                self.screen.blit(self.fire1, (x, y))
             
-    def update(self, alpha, global_c, global_l,frame1_rocket_length, t, frame1_ind, border):
-        self.global_rocket_x = self.global_rocket_x_start + t*alpha*global_c 
-        self.rect.centerx = self.global_rocket_x - (frame1_ind*4 - 1.5)*global_l + border 
+    def update(self, alpha, global_c, global_l,frame1_rocket_length, t, frame1_ind, border, x = None):
+        if x is None:
+            # velocidad constante
+            x = self.global_rocket_x_start + t*alpha*global_c
+        self.global_rocket_x = x
+        # solo la posición; rect es del dibujo y lo ajusta Lx_scale
+        self.center_x = self.global_rocket_x - (frame1_ind*4 - 1.5)*global_l + border 
        
-    def Lx_scale(self, alpha, center_y, global_l):
+    def Lx_scale(self, alpha, center_y, global_l, shift = None, level = 0, center_x = None):
+        # shift (Doppler.ColorShift) y level tiñen la imagen contraída;
+        # un global_l menor que el del constructor dibuja el cohete reducido
         self.k = math.sqrt(1-alpha*alpha)
         self.scale = 1/self.k
-        self.img_rocket = pygame.transform.scale(self.img_rocket, (int(global_l/self.scale), int(global_l*0.411)))
+        self.size = global_l/self.global_l
+        width = int(global_l/self.scale)
+        height = int(global_l*0.411)
+        self.img_rocket = self.cache.get((width, height, level))
+        if self.img_rocket is None:
+            img = self.img1
+            if level != 0:
+                # se tiñe una vez por nivel; con alpha cambiando solo se escala
+                img = self.tint_cache.get(level)
+                if img is None:
+                    img = shift.apply(self.img1, level)
+                    self.tint_cache.put(level, img)
+            self.img_rocket = pygame.transform.scale(img, (width, height))
+            self.cache.put((width, height, level), self.img_rocket)
+        if center_x is None:
+            center_x = self.rect.centerx
         self.rect = self.img_rocket.get_rect()
-        self.rect_fire = self.fire1.get_rect()
+        self.rect.centerx = center_x
         self.rect.centery = center_y
     
     def img_load(self):
-        self.img_rocket = self.img1
+        # el fuego se ajusta a la escala del último Lx_scale
         self.fire1 = self.img2
         self.fire2 = self.img3
         self.fire3 = self.img4
-        self.fire1 = pygame.transform.scale(self.fire1, (int(100//self.scale), 50))
-        self.fire2 = pygame.transform.scale(self.fire2, (int(100//self.scale), 50))
-        self.fire3 = pygame.transform.scale(self.fire3, (int(100//self.scale), 50))
\ No newline at end of file
+        width = int(100*self.size//self.scale)
+        height = int(50*self.size)
+        fires = self.fire_cache.get((width, height))
+        if fires is None:
+            fires = (pygame.transform.scale(self.fire1, (width, height)),
+                     pygame.transform.scale(self.fire2, (width, height)),
+                     pygame.transform.scale(self.fire3, (width, height)))
+            self.fire_cache.put((width, height), fires)
+        self.fire1, self.fire2, self.fire3 = fires
+        self.rect_fire = self.fire1.get_rect()
\ No newline at end of file
@@ -0,0 +1,100 @@
+import json
+import math
+
+import numpy as np
+
+class Scenario():
+    '''Trayectoria precalculada a partir de un archivo de escenario.
+
+    El archivo es un JSON con una lista de segmentos en "segments". Cada
+    segmento dura "t" segundos (tiempo del marco de los pilares) y puede
+    fijar una velocidad constante con "alpha" (v/c) o una aceleración propia
+    constante con "accel" (en c por segundo). Sin ninguna de las dos claves
+    el cohete sigue con la velocidad que traía.
+
+    Posición, rapidez y tiempo propio se integran una sola vez en tablas
+    densas; en cada cuadro solo se interpola.
+    '''
+
+    def __init__(self, filename, global_c, dt = 1/240):
+        with open(filename, encoding='utf-8') as f:
+            data = json.load(f)
+        self.name = data.get('name', filename)
+        self.global_c = global_c
+        self.dt = dt
+
+        # celeridad u = sinh(rapidez) por segmento; con aceleración propia
+        # constante u crece linealmente con el tiempo coordenado
+        t_parts = []
+        u_parts = []
+        t0 = 0.0
+        u0 = 0.0
+        for i, segment in enumerate(data['segments']):
+            duration = float(segment.get('t', 0))
+            if not duration > 0:
+                raise ValueError('%s: el segmento %d necesita una duración "t" positiva' % (filename, i))
+            n = max(int(round(duration/dt)), 1)
+            t = t0 + np.arange(n)*dt
+            if 'alpha' in segment:
+                alpha = float(segment['alpha'])
+                if not abs(alpha) < 1:
+                    raise ValueError('%s: en el segmento %d "alpha" debe cumplir |alpha| < 1' % (filename, i))
+                u0 = alpha/math.sqrt(1 - alpha*alpha)
+                u = np.full(n, u0)
+            elif 'accel' in segment:
+                u = u0 + float(segment['accel'])*(t - t0)
+                u0 = u0 + float(segment['accel'])*n*dt
+            else:
+                u = np.full(n, u0)
+            t_parts.append(t)
+            u_parts.append(u)
+            t0 += n*dt
+        t_parts.append(np.array([t0]))
+        u_parts.append(np.array([u0]))
+
+        self.t = np.concatenate(t_parts)
+        u = np.concatenate(u_parts)
+        self.rapidity = np.arcsinh(u)
+        self.alpha = np.tanh(self.rapidity)
+        # dtau/dt = 1/gamma = 1/cosh(rapidez)
+        beta = 1/np.cosh(self.rapidity)
+
+        # integración trapezoidal acumulada
+        self.x = np.zeros_like(self.t)
+        self.x[1:] = np.cumsum((self.alpha[1:] + self.alpha[:-1])*0.5*dt)*global_c
+        self.tau = np.zeros_like(self.t)
+        self.tau[1:] = np.cumsum((beta[1:] + beta[:-1])*0.5*dt)
+
+        self.t_end = float(self.t[-1])
+        self.last = len(self.t) - 1
+
+    def at(self, t):
+        '''regresa (x, alpha, tau) en el tiempo t del marco de los pilares'''
+        if t <= 0:
+            return(0.0, float(self.alpha[0]), 0.0)
+        if t >= self.t_end:
+            # después del último segmento sigue a velocidad constante
+            alpha = float(self.alpha[-1])
+            dt = t - self.t_end
+            return(float(self.x[-1]) + alpha*self.global_c*dt, alpha,
+                   float(self.tau[-1]) + math.sqrt(1 - alpha*alpha)*dt)
+        # la malla es uniforme, el índice sale directo sin buscar
+        i = int(t/self.dt)
+        if i >= self.last:
+            i = self.last - 1
+        w = (t - self.t[i])/self.dt
+        x = self.x[i] + (self.x[i+1] - self.x[i])*w
+        alpha = self.alpha[i] + (self.alpha[i+1] - self.alpha[i])*w
+        tau = self.tau[i] + (self.tau[i+1] - self.tau[i])*w
+        return(float(x), float(alpha), float(tau))
+
+    def x_at(self, t):
+        '''posición para un arreglo de tiempos t; antes de 0 y después del
+        último segmento el cohete va a velocidad constante'''
+        x = np.interp(t, self.t, self.x)
+        x = np.where(t < 0, float(self.alpha[0])*self.global_c*t, x)
+        return np.where(t > self.t_end, float(self.x[-1]) + float(self.alpha[-1])*self.global_c*(t - self.t_end), x)
+
+    def velocity_at(self, t):
+        '''velocidad en px/s para un arreglo de tiempos t'''
+        return np.interp(t, self.t, self.alpha)*self.global_c
@@ -0,0 +1,40 @@
+import threading
+
+class DoubleBuffer():
+    '''Intercambio de estados entre la simulación y el hilo de dibujo.
+
+    Hay dos ranuras: "pending" con el último estado publicado que aún no se
+    dibuja y "front" con el que se está dibujando. La simulación nunca
+    espera al dibujo (un estado sin dibujar se reemplaza por el nuevo),
+    salvo con publish(wait=True), que se usa al correr con tiempo simulado
+    para que cada cuadro se dibuje una vez. Los estados son inmutables, así
+    que ningún hilo los modifica después de publicarlos.
+    '''
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pending = None
+        self.front = None
+        self.closed = False
+
+    def publish(self, snapshot, wait = False):
+        with self.cond:
+            while wait and self.pending is not None and not self.closed:
+                self.cond.wait()
+            self.pending = snapshot
+            self.cond.notify_all()
+
+    def take(self):
+        '''siguiente estado a dibujar; None cuando ya se cerró y no queda nada'''
+        with self.cond:
+            while self.pending is None and not self.closed:
+                self.cond.wait()
+            self.front, self.pending = self.pending, None
+            self.cond.notify_all()
+            return self.front
+
+    def close(self):
+        # el último estado publicado todavía se entrega
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
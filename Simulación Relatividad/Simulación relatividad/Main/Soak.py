@@ -0,0 +1,125 @@
+'''Prueba de resistencia del modo kiosco.
+
+Corre el ciclo de run_game sin ventana durante horas de cuadros simulados
+(60 cuadros por segundo simulado, sin esperar al reloj) y falla si la
+memoria (RSS y memoria de Python), el tiempo por cuadro o la tasa de
+superficies nuevas crecen a lo largo de la corrida.
+
+Se ejecuta desde la carpeta del proyecto, como Main.py:
+
+    python Soak.py --hours 2
+'''
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+import Main
+
+FRAME_MS = 1000/60
+
+def rss_mb():
+    '''memoria residente del proceso en MB, None si no se puede medir'''
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1])*os.sysconf('SC_PAGE_SIZE')/2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss/2**20
+    except ImportError:
+        return None
+
+class Soak():
+
+    def __init__(self, window, session):
+        self.window = window
+        self.session = session
+        self.windows = []
+        self.t_window = time.perf_counter()
+        self.misses_window = 0
+
+    def on_frame(self, frame_count, surfaces, misses):
+        # visitante: arranca el escenario y mueve la línea de tiempo;
+        # el modo kiosco se encarga de regresar al estado inicial
+        step = frame_count % self.session
+        if step == 1:
+            pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_SPACE))
+        elif step == self.session//2:
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RIGHT))
+        elif step == self.session//2 + 120:
+            pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_RIGHT))
+
+        if frame_count % self.window == 0:
+            now = time.perf_counter()
+            sample = {
+                'frame': frame_count,
+                'frame_ms': (now - self.t_window)*1000/self.window,
+                'rss_mb': rss_mb(),
+                'py_mb': tracemalloc.get_traced_memory()[0]/2**20,
+                'surfaces': surfaces,
+                'alloc_per_frame': (misses - self.misses_window)/self.window,
+            }
+            self.windows.append(sample)
+            self.t_window = now
+            self.misses_window = misses
+            rss = '?' if sample['rss_mb'] is None else '%7.1f' % sample['rss_mb']
+            print('{frame:>9} cuadros  {frame_ms:6.2f} ms/cuadro  RSS {rss} MB  '
+                  'python {py_mb:6.2f} MB  superficies {surfaces:4}  '
+                  'nuevas/cuadro {alloc_per_frame:.4f}'.format(rss=rss, **sample), flush=True)
+
+    def check(self, max_rss_growth, max_py_growth, max_frame_growth):
+        '''compara el principio de la corrida (tras el calentamiento) con el final'''
+        errors = []
+        if len(self.windows) < 7:
+            return ['corrida demasiado corta para comparar']
+        first = self.windows[1]
+        last = self.windows[-1]
+        third = len(self.windows)//3
+        first_ms = statistics.median(w['frame_ms'] for w in self.windows[1:third + 1])
+        last_ms = statistics.median(w['frame_ms'] for w in self.windows[-third:])
+        if first['rss_mb'] is not None and last['rss_mb'] - first['rss_mb'] > max_rss_growth:
+            errors.append('RSS creció %.1f MB' % (last['rss_mb'] - first['rss_mb']))
+        if last['py_mb'] - first['py_mb'] > max_py_growth:
+            errors.append('memoria de Python creció %.2f MB' % (last['py_mb'] - first['py_mb']))
+        if last_ms > first_ms*max_frame_growth:
+            errors.append('tiempo por cuadro pasó de %.2f a %.2f ms' % (first_ms, last_ms))
+        if last['alloc_per_frame'] > first['alloc_per_frame'] + 0.01:
+            errors.append('superficies nuevas por cuadro pasaron de %.4f a %.4f'
+                          % (first['alloc_per_frame'], last['alloc_per_frame']))
+        half = len(self.windows)//2
+        if max(w['surfaces'] for w in self.windows[half:]) > max(w['surfaces'] for w in self.windows[:half]):
+            errors.append('el número de superficies en caché sigue creciendo')
+        return errors
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prueba de resistencia del modo kiosco')
+    parser.add_argument('--hours', type=float, default=1.0, help='horas simuladas a 60 cuadros por segundo')
+    parser.add_argument('--scenario', default='escenarios/gemelos.json')
+    parser.add_argument('--window', type=int, default=60*60*5, help='cuadros por muestra')
+    parser.add_argument('--session', type=int, default=60*60*4, help='cuadros entre visitantes')
+    parser.add_argument('--max-rss-growth', type=float, default=16.0, help='MB')
+    parser.add_argument('--max-py-growth', type=float, default=2.0, help='MB')
+    parser.add_argument('--max-frame-growth', type=float, default=1.25, help='razón')
+    args = parser.parse_args()
+
+    frames = int(args.hours*3600*60)
+    soak = Soak(args.window, args.session)
+    tracemalloc.start()
+    Main.run_game(args.scenario, kiosk=True, max_frames=frames, frame_ms=FRAME_MS, on_frame=soak.on_frame)
+    pygame.quit()
+
+    errors = soak.check(args.max_rss_growth, args.max_py_growth, args.max_frame_growth)
+    for error in errors:
+        print('FALLA:', error)
+    if errors:
+        sys.exit(1)
+    print('OK')
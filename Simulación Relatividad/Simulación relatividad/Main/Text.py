@@ -0,0 +1,22 @@
+from Cache import Cache
+
+class Text():
+    '''Texto dibujado letra por letra con glifos en caché.
+
+    Los relojes cambian de texto en cada cuadro; renderizar cada letra una
+    sola vez evita crear una superficie nueva por cada font.render.
+    '''
+
+    def __init__(self, font, size = 256):
+        self.font = font
+        self.glyphs = Cache(size)
+
+    def blit(self, screen, text, color, location):
+        x, y = location
+        for char in text:
+            glyph = self.glyphs.get((char, color))
+            if glyph is None:
+                glyph = self.font.render(char, True, color)
+                self.glyphs.put((char, color), glyph)
+            screen.blit(glyph, (x, y))
+            x += glyph.get_width()
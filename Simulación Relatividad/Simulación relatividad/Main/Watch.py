@@ -21,6 +21,9 @@ class Watch():
       
     def blitme(self, color):
         self.screen.blit(self.img, self.rect)
+        self.blithand(color)
+        
+    def blithand(self, color):
         pygame.draw.line(self.screen, color, (self.rect.centerx, self.rect.centery - 15), 
                         (self.rect.centerx + self.x, self.rect.centery - 15 - self.y), 3)
         
\ No newline at end of file